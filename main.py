@@ -1,34 +1,82 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import Response
 from pydantic import BaseModel
 import uvicorn
-from typing import List, Optional
-import requests
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-
-from selenium.webdriver.support import expected_conditions as EC
-import time
+from typing import Dict, List, Optional, Union
+from contextlib import asynccontextmanager
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import httpx
+from aiolimiter import AsyncLimiter
+from cachetools import TTLCache
+from selectolax.lexbor import LexborHTMLParser
 import urllib.parse
+import re
 import os
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from fpdf import FPDF, XPos, YPos
 from datetime import datetime
 
+# Upper bound on concurrent connections to DuckDuckGo
+MAX_CONNECTIONS = 4
+# Seconds an idle connection is kept open for reuse (httpx default is 5)
+KEEPALIVE_EXPIRY = 60
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Builds the shared HTTP client, kept alive across requests so connections are reused
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=5,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY
+        ),
+        # Only the HTML document is ever fetched; httpx adds br to Accept-Encoding when brotli is installed
+        headers={
+            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+            "Accept": "text/html"
+        }
+    )
+
+async def warm_up_connection(http_client: httpx.AsyncClient):
+    """
+    Opens the first DuckDuckGo connection at startup instead of on the first search
+    """
+    try:
+        await http_client.head(SEARCH_URL)
+    except httpx.HTTPError:
+        pass  # The first search will connect instead
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Per-lifespan resources live on app.state so each startup gets fresh ones
+    app.state.http_client = create_http_client()
+    # Limits how many result pages are fetched at once
+    app.state.page_semaphore = asyncio.Semaphore(MAX_CONNECTIONS)
+    # Token bucket shared by all scrapes so DuckDuckGo sees at most 5 page requests per second
+    app.state.rate_limiter = AsyncLimiter(5, 1)
+    # Worker processes for PDF generation, keeping it off the event loop
+    app.state.pdf_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+    warm_up = asyncio.create_task(warm_up_connection(app.state.http_client))
+    try:
+        yield
+    finally:
+        warm_up.cancel()
+        # Close pooled connections and PDF workers on shutdown; waiting for queued
+        # PDFs happens in a thread so the event loop isn't blocked meanwhile
+        await app.state.http_client.aclose()
+        await asyncio.to_thread(app.state.pdf_pool.shutdown)
+
 # Create FastAPI app instance
 app = FastAPI(
     title="Web Scraper API with PDF",
     description="API for scraping web content and exporting results as JSON or PDF",
-    version="1.2.0"
+    version="1.2.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware to allow cross-origin requests
@@ -54,85 +102,254 @@ class SearchResponse(BaseModel):
     results: List[SearchResult]
     total_results: int
 
-class FastWebScraper:
-    def __init__(self):
-        self.chrome_options = Options()
-        self.chrome_options.add_argument("--headless")  # Run in headless mode (no UI)
-        self.chrome_options.add_argument("--disable-gpu")
-        self.chrome_options.add_argument("--no-sandbox")
-        self.chrome_options.add_argument("--disable-dev-shm-usage")
+class PdfQueuedResponse(BaseModel):
+    message: str
+    pdf_path: str
+    status: str
+
+# Top-level domains accepted by FastWebScraper.is_valid_url
+ALLOWED_DOMAINS = ('.com', '.org', '.net', '.edu', '.gov', '.io')
+
+# CSS classes of the fields extracted from each result
+RESULT_FIELDS = ("result__title", "result__url", "result__snippet")
+RESULT_FIELDS_SELECTOR = ", ".join(f".{name}" for name in RESULT_FIELDS)
+
+# DuckDuckGo's HTML-only endpoint (duckduckgo.com/html/ redirects here)
+SEARCH_URL = "https://html.duckduckgo.com/html/"
+# Number of results DuckDuckGo returns per HTML page
+RESULTS_PER_PAGE = 30
+
+def pdf_text(text: str) -> str:
+    """
+    Replaces characters the built-in Helvetica font cannot encode in cp1252 (WinAnsi)
+    """
+    return text.encode("cp1252", "replace").decode("cp1252")
+
+# Longest description written to a PDF; DuckDuckGo snippets can run long
+MAX_DESCRIPTION_LENGTH = 500
 
-        # Explicitly specify the Chrome binary location
-        self.chrome_options.binary_location = "/usr/bin/google-chrome-stable"
+class ResultsPDF(FPDF):
+    """
+    Letter-sized report that repeats the query header on every page
+    """
+    def __init__(self, query: str):
+        super().__init__(unit="pt", format="letter")
+        # WinAnsi covers the curly quotes and dashes common in titles and snippets
+        self.core_fonts_encoding = "windows-1252"
+        self.query = query
+        self.set_margins(100, 30, 50)
+        self.set_auto_page_break(True, margin=50)
+        self.set_font("Helvetica", size=12)
+        # Deflate page streams (fpdf2's default, kept explicit for smaller files)
+        self.set_compression(True)
 
-        # Automatically install the correct ChromeDriver
-        self.service = Service(ChromeDriverManager().install())
+    def header(self):
+        self.cell(0, 20, pdf_text(f"Search Results for: {self.query}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.ln(10)
 
-    def search_topic(self, topic: str, num_pages: int = 10):
+class FastWebScraper:
+    async def search_topic(self, topic: str, max_results: int = 50, num_pages: int = 10):
         search_results = []
-        driver = webdriver.Chrome(service=self.service, options=self.chrome_options)
-
-        try:
-            search_query = urllib.parse.quote(topic)
-            search_url = f"https://duckduckgo.com/html/?q={search_query}"
-            driver.get(search_url)
-
-            results = driver.find_elements(By.CLASS_NAME, "result__body")
-            for result in results:
-                try:
-                    title = result.find_element(By.CLASS_NAME, "result__title").text.strip()
-                    url = result.find_element(By.CLASS_NAME, "result__url").get_attribute("href")
-                    snippet = result.find_element(By.CLASS_NAME, "result__snippet").text.strip()
-
-                    search_results.append({"title": title, "url": url, "description": snippet})
-                except Exception:
+        seen = set()
+        # Query part of the URL is the same for every page; only the offset varies
+        url_prefix = f"{SEARCH_URL}?q={urllib.parse.quote(topic)}&s="
+
+        # Fetch only as many pages as needed to reach max_results, in concurrent waves
+        page = 0
+        while page < num_pages and len(search_results) < max_results:
+            remaining = max_results - len(search_results)
+            wave = range(page, min(num_pages, page + -(-remaining // RESULTS_PER_PAGE)))
+            pages = await asyncio.gather(
+                *(self._scrape_page(url_prefix, p) for p in wave),
+                return_exceptions=True
+            )
+
+            # Only the first page is required; later pages are best effort
+            if page == 0 and isinstance(pages[0], Exception):
+                raise pages[0]
+
+            added = False
+            for page_results in pages:
+                if isinstance(page_results, Exception):
                     continue
-        finally:
-            driver.quit()
-        
+
+                # Skip repeated and disallowed URLs so they don't use up max_results;
+                # urls are already unwrapped from DuckDuckGo's redirect links
+                for result in page_results:
+                    if len(search_results) >= max_results:
+                        break
+                    url = result["url"]
+                    if url and url not in seen and self.is_valid_url(url):
+                        seen.add(url)
+                        search_results.append(result)
+                        added = True
+
+            # DuckDuckGo has run out of new results
+            if not added:
+                break
+            page = wave.stop
+
         return search_results
 
+    async def _scrape_page(self, url_prefix: str, page: int) -> List[dict]:
+        """
+        Fetches and parses a single page of DuckDuckGo results
+        """
+        page_results = []
+
+        state = app.state
+        async with state.rate_limiter, state.page_semaphore:
+            response = await state.http_client.get(url_prefix + str(page * RESULTS_PER_PAGE))
+        response.raise_for_status()
+
+        # Parse the raw bytes and collect each result's fields in one selector pass
+        results = LexborHTMLParser(response.content).css("div.result__body")
+        for result in results:
+            fields = {}
+            for node in result.css(RESULT_FIELDS_SELECTOR):
+                classes = (node.attributes.get("class") or "").split()
+                for name in RESULT_FIELDS:
+                    if name in classes:
+                        fields.setdefault(name, node)
+            if len(fields) < len(RESULT_FIELDS):
+                continue
+
+            page_results.append({
+                "title": " ".join(fields["result__title"].text().split()),
+                "url": self._target_url(str(response.url), fields["result__url"].attributes.get("href") or ""),
+                "description": " ".join(fields["result__snippet"].text().split())
+            })
+
+        return page_results
+
+    def _target_url(self, base_url: str, href: str) -> str:
+        """
+        Resolves a result link, unwrapping DuckDuckGo's //duckduckgo.com/l/?uddg=<target> redirects
+        """
+        url = urllib.parse.urljoin(base_url, href)
+        parts = urllib.parse.urlsplit(url)
+        if (parts.hostname or "").endswith("duckduckgo.com"):
+            target = urllib.parse.parse_qs(parts.query).get("uddg")
+            if target:
+                return target[0]
+        return url
+
     def is_valid_url(self, url: str) -> bool:
         """
         Quick validation of URLs
         """
-        allowed_domains = ['.com', '.org', '.net', '.edu', '.gov', '.io']
-        return any(domain in url.lower() for domain in allowed_domains)
+        host = urllib.parse.urlsplit(url).hostname or ""
+        return host.endswith(ALLOWED_DOMAINS)
 
-    def generate_pdf(self, query: str, results: List[dict]) -> str:
+    def pdf_filename(self, query: str) -> str:
         """
-        Generates and stores a PDF file with search results
+        Builds a timestamped PDF file name for a query
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        pdf_filename = f"search_results_{query.replace(' ', '_')}_{timestamp}.pdf"
-        pdf_path = os.path.join(PDF_DIR, pdf_filename)
+        safe_query = re.sub(r"[^\w.-]+", "_", query)
+        return f"search_results_{safe_query}_{timestamp}.pdf"
 
-        c = canvas.Canvas(pdf_path, pagesize=letter)
-        c.setFont("Helvetica", 12)
+    def generate_pdf_to(self, pdf_path: str, query: str, results: List[dict]):
+        """
+        Generates a PDF file with search results at the given path
+        """
+        self._build_pdf(query, results).output(pdf_path)
 
-        y = 750
-        c.drawString(100, y, f"Search Results for: {query}")
-        y -= 30
+    def generate_pdf_bytes(self, query: str, results: List[dict]) -> bytes:
+        """
+        Generates a PDF with search results in memory and returns its bytes
+        """
+        return bytes(self._build_pdf(query, results).output())
+
+    def _build_pdf(self, query: str, results: List[dict]) -> "ResultsPDF":
+        """
+        Lays out the search results, letting fpdf2 handle wrapping and page breaks
+        """
+        pdf = ResultsPDF(query)
+        pdf.add_page()
 
         for result in results:
-            if y < 50:
-                c.showPage()
-                c.setFont("Helvetica", 12)
-                y = 750
-            
-            c.drawString(100, y, f"Title: {result['title']}")
-            y -= 20
-            c.drawString(100, y, f"URL: {result['url']}")
-            y -= 20
-            c.drawString(100, y, f"Description: {result.get('description', 'N/A')}")
-            y -= 40
-
-        c.save()
-        return pdf_path  # Return stored PDF path
+            pdf.multi_cell(
+                0, 20,
+                pdf_text(
+                    f"Title: {result['title']}\n"
+                    f"URL: {result['url']}\n"
+                    f"Description: {(result.get('description') or 'N/A')[:MAX_DESCRIPTION_LENGTH]}"
+                ),
+                new_x=XPos.LMARGIN, new_y=YPos.NEXT
+            )
+            pdf.ln(20)
+
+        return pdf
 
 # Create a single instance of the scraper to be reused
 scraper = FastWebScraper()
 
+# Recent search results keyed by (normalized query, max_results)
+search_cache = TTLCache(maxsize=1024, ttl=600)
+# Empty results are kept only briefly so a throttled scrape is retried soon
+empty_search_cache = TTLCache(maxsize=1024, ttl=30)
+# Per-key locks so concurrent identical queries trigger a single scrape
+search_locks: Dict[tuple, asyncio.Lock] = {}
+
+# Short-lived snapshot of the stored PDF names, cleared when a PDF is written
+pdf_listing = TTLCache(maxsize=1, ttl=5)
+
+def list_pdf_files() -> List[str]:
+    """
+    Returns stored PDF file names, rescanning PDF_DIR at most every few seconds
+    """
+    pdf_files = pdf_listing.get(PDF_DIR)
+    if pdf_files is None:
+        with os.scandir(PDF_DIR) as entries:
+            pdf_files = [e.name for e in entries if e.name.endswith(".pdf")]
+        pdf_listing[PDF_DIR] = pdf_files
+    return pdf_files
+
+def cached_results(key: tuple) -> Optional[List[dict]]:
+    """
+    Looks up a search key in the result caches
+    """
+    results = search_cache.get(key)
+    if results is None:
+        results = empty_search_cache.get(key)
+    return results
+
+async def cached_search(query: str, max_results: int) -> List[dict]:
+    """
+    Returns cached results for a query, scraping only on a cache miss
+    """
+    key = (query.strip().lower(), max_results)
+    results = cached_results(key)
+    if results is not None:
+        return results
+
+    lock = search_locks.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            results = cached_results(key)
+            if results is None:
+                results = await scraper.search_topic(query, max_results=max_results)
+                # Empty results usually mean DuckDuckGo throttled us; don't hide the query for long
+                if results:
+                    search_cache[key] = results
+                else:
+                    empty_search_cache[key] = results
+    finally:
+        if not lock.locked() and search_locks.get(key) is lock:
+            del search_locks[key]
+
+    return results
+
+async def store_pdf(pdf_path: str, query: str, results: List[dict]):
+    """
+    Writes a PDF in a worker process; run as a background task after the response
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(app.state.pdf_pool, scraper.generate_pdf_to, pdf_path, query, results)
+    # Invalidate here; the worker process has its own copy of the listing cache
+    pdf_listing.clear()
+
 @app.get("/")
 async def root():
     """
@@ -148,8 +365,14 @@ async def root():
         }
     }
 
-@app.get("/webscrape")
-async def webscrape(query: str, max_results: Optional[int] = 50, output_format: Optional[str] = "json"):
+@app.get("/webscrape", response_model=Union[SearchResponse, PdfQueuedResponse])
+async def webscrape(
+    query: str,
+    background_tasks: BackgroundTasks,
+    max_results: Optional[int] = 50,
+    output_format: Optional[str] = "json",
+    background: Optional[bool] = False
+):
     """
     Endpoint for web scraping based on a search query
 
@@ -157,9 +380,11 @@ async def webscrape(query: str, max_results: Optional[int] = 50, output_format:
     - query: The search topic to scrape
     - max_results: Maximum number of results to return (default: 50)
     - output_format: "json" (default) or "pdf"
+    - background: with "pdf", store the file under 'pdfs' in the background
+      and return its path immediately instead of the file itself
 
     Returns:
-    - JSON object or a downloadable PDF file
+    - JSON object, a downloadable PDF file, or the path of a queued PDF
     """
     try:
         if not query or len(query.strip()) == 0:
@@ -168,17 +393,34 @@ async def webscrape(query: str, max_results: Optional[int] = 50, output_format:
         if max_results < 1 or max_results > 50:
             raise HTTPException(status_code=400, detail="max_results must be between 1 and 50")
         
-        results = scraper.search_topic(query)[:max_results]
+        results = await cached_search(query, max_results)
         
+        if output_format.lower() == "pdf" and background:
+            pdf_path = os.path.join(PDF_DIR, scraper.pdf_filename(query))
+            background_tasks.add_task(store_pdf, pdf_path, query, results)
+            return {"message": "PDF queued", "pdf_path": pdf_path, "status": "queued"}
+
         if output_format.lower() == "pdf":
-            pdf_path = scraper.generate_pdf(query, results)
-            return {"message": "PDF generated", "pdf_path": pdf_path}
+            loop = asyncio.get_running_loop()
+            pdf_bytes = await loop.run_in_executor(app.state.pdf_pool, scraper.generate_pdf_bytes, query, results)
+            filename = scraper.pdf_filename(query)
+            # Plain ASCII name for clients that ignore the RFC 5987 filename* form
+            ascii_filename = filename.encode("ascii", "replace").decode("ascii").replace("?", "_")
+            content_disposition = (
+                f'attachment; filename="{ascii_filename}"; '
+                f"filename*=utf-8''{urllib.parse.quote(filename, safe='')}"
+            )
+            return Response(
+                content=pdf_bytes,
+                media_type="application/pdf",
+                headers={"Content-Disposition": content_disposition}
+            )
 
-        return JSONResponse(content={
+        return {
             "query": query,
             "results": results,
             "total_results": len(results)
-        })
+        }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -189,7 +431,7 @@ async def list_pdfs():
     Lists all stored PDFs in the 'pdfs' directory
     """
     try:
-        pdf_files = [f for f in os.listdir(PDF_DIR) if f.endswith(".pdf")]
+        pdf_files = list_pdf_files()
         if not pdf_files:
             return {"message": "No PDFs found."}
         